@@ -28,6 +28,9 @@ setup_kwargs = {
         ],
         'prometheus': [
             'prometheus-client'
+        ],
+        'uvloop': [
+            'uvloop'
         ]
     },
     'entry_points': '''
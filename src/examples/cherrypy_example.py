@@ -6,7 +6,6 @@ import cherrypy
 import jinja2
 import logging
 import os
-import time
 
 from looselycoupled import module_threaded
 
@@ -34,7 +33,7 @@ class WebApp():
     def index(self, action=None, id=None, username=None):
         """Show a list of existing machines"""
         #cherrypy.log('Index page requested', context='WEBAPP', severity=logging.INFO, traceback=False)
-        logger.info(f'Index page requested, action [{action}], id [{id}]')
+        logger.info('Index page requested, action [%s], id [%s]', action, id)
         
         if action == 'trigger':
             # Examples for calling modules' methods outside the event loop thread
@@ -145,8 +144,7 @@ class CherryPyExample(module_threaded.ModuleThreaded):
     def thread_run(self):
         logger.info('Starting CherryPy webserver...')
         cherrypy.engine.start()
-        while not self.event_no_longer_active.is_set():
-            time.sleep(1)
+        self.event_no_longer_active.wait()
         logger.info('Stopping CherryPy webserver...')
         cherrypy.engine.exit()
         # Don't call the following as it also attempts to wait for non-CherryPy-threads in a blocking manner
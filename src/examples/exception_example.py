@@ -13,7 +13,7 @@ class ExeptionModule(module.Module):
 
     async def run(self, metadata):
         logger.info('run called')
-        a = 1 / 0
+        raise ZeroDivisionError('Exception raised for demonstration purposes')
 
 
 module_class = ExeptionModule
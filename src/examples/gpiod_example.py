@@ -13,6 +13,16 @@ from looselycoupled import module_gpiod
 
 logger = logging.getLogger(__name__)
 
+# Cycle of output states for demonstration purposes
+_NEXT_STATE = {
+    module_gpiod.OutputState.OFF: module_gpiod.OutputState.ON,
+    module_gpiod.OutputState.ON: module_gpiod.OutputState.BLINK_VERYSLOW,
+    module_gpiod.OutputState.BLINK_VERYSLOW: module_gpiod.OutputState.BLINK_SLOW,
+    module_gpiod.OutputState.BLINK_SLOW: module_gpiod.OutputState.BLINK,
+    module_gpiod.OutputState.BLINK: module_gpiod.OutputState.BLINK_FAST,
+    module_gpiod.OutputState.BLINK_FAST: module_gpiod.OutputState.OFF,
+}
+
 
 class GpiodExample(module_gpiod.ModuleGpiod):
     """Example application module for accessing GPIOs"""
@@ -44,28 +54,17 @@ class GpiodExample(module_gpiod.ModuleGpiod):
 
     async def modify_output_states(self, metadata):
         """Changes outputs for demonstration purposes"""
-        # Line 4
-        await self.set_output_state(4, module_gpiod.OutputState.ON)
         # Line 17
         state = await self.get_output_state(17)
-        if state == module_gpiod.OutputState.OFF:
-            state_new = module_gpiod.OutputState.ON
-        elif state == module_gpiod.OutputState.ON:
-            state_new = module_gpiod.OutputState.BLINK_VERYSLOW
-        elif state == module_gpiod.OutputState.BLINK_VERYSLOW:
-            state_new = module_gpiod.OutputState.BLINK_SLOW
-        elif state == module_gpiod.OutputState.BLINK_SLOW:
-            state_new = module_gpiod.OutputState.BLINK
-        elif state == module_gpiod.OutputState.BLINK:
-            state_new = module_gpiod.OutputState.BLINK_FAST
-        elif state == module_gpiod.OutputState.BLINK_FAST:
-            state_new = module_gpiod.OutputState.OFF
-        else:
+        state_new = _NEXT_STATE.get(state)
+        if state_new is None:
             logger.error('Unknown output state')
-        await self.set_output_state('Output17_ForBlinking', state_new)
-        logger.info(f'Setting output 17 to state [{state_new}]')
+            return
+        # Lines 4 and 17 at once
+        await self.set_output_states(metadata, { 4: module_gpiod.OutputState.ON, 'Output17_ForBlinking': state_new })
+        logger.info('Setting output 17 to state [%s]', state_new)
         # Line 27
-        await self.toggle_output_state(27)
+        await self.toggle_output_state(metadata, 27)
 
 
 
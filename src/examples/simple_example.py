@@ -22,9 +22,8 @@ class SimpleExampleModule(module.Module):
         # Call a method in local module asynchronously, i.e. we put it into the queue and do not wait for the result
         await self.enqueue_task('myfunc', param='Hello')
         await self.enqueue_task('myfunc_async', param='World')
-        # All task/event functions may share metadata and thus become dependent requests
-        await self.enqueue_task('myfunc', metadata=metadata, param='Hello')
-        await self.enqueue_task('myfunc_async', metadata=metadata, param='World')
+        # All task/event functions may share metadata and thus become dependent requests; such tasks may be enqueued at once
+        await self.enqueue_tasks([('myfunc', {'param': 'Hello'}), ('myfunc_async', {'param': 'World'})], metadata=metadata)
         # Call a method in another module synchronously
         pos = await self.exec_task('cherrypy_example.add_log_entry', metadata=metadata, text='This line was synchronously added by the module "simple_example"')
         logger.info(f'Synchronous call to cherrypy_example.add_line yields result [{pos}]')
@@ -1,18 +1,64 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
-from collections import namedtuple
+from collections import deque, namedtuple
 
-from .metadata import Metadata
+from .metadata import Metadata, Priority
 
 
-class CmdQueue(asyncio.PriorityQueue):
-    """Child class of an async priority queue with adapted queue items"""
+class CmdQueue():
+    """Async queue with one FIFO per priority level (lower priority value is served first)"""
 
     QueueItem = namedtuple('QueueItem', ['target', 'metadata', 'kwargs'])
 
-    async def put(self, target=None, metadata=None, kwargs=None):
-        """Put an item with the provided attribute values into the queue"""
+    def __init__(self):
+        """Instance initialization"""
+        self._buckets = [deque() for _ in range(len(Priority))]  # one FIFO per priority level
+        self._bucket_by_priority = dict(zip(Priority, self._buckets))  # priority -> FIFO
+        self._count = 0  # number of items in all buckets
+        self._nonempty = None  # event set while there are items in the queue (created on first wait within the event loop)
+
+    def empty(self):
+        """Returns whether the queue is empty"""
+        return self._count == 0
+
+    def qsize(self):
+        """Returns the number of items in the queue"""
+        return self._count
+
+    def put_nowait(self, target=None, metadata=None, kwargs=None):
+        """Put an item with the provided attribute values into the queue (the queue is unbounded; never blocks)"""
         if metadata is None:
             metadata = Metadata()
-        await super().put((metadata.priority, CmdQueue.QueueItem(target, metadata, kwargs )))
+        bucket = self._bucket_by_priority.get(metadata.priority)
+        if bucket is None:
+            raise ValueError(f'Invalid priority [{metadata.priority}]')
+        bucket.append(CmdQueue.QueueItem(target, metadata, kwargs))
+        self._count += 1
+        if self._nonempty is not None:
+            self._nonempty.set()
+
+    async def put(self, target=None, metadata=None, kwargs=None):
+        """Put an item with the provided attribute values into the queue"""
+        self.put_nowait(target, metadata, kwargs)
+
+    def get_nowait(self):
+        """Remove and return the item with the highest priority; raise QueueEmpty if there is none"""
+        if not self._count:
+            raise asyncio.QueueEmpty
+        for bucket in self._buckets:
+            if bucket:
+                self._count -= 1
+                if (not self._count) and (self._nonempty is not None):
+                    self._nonempty.clear()
+                return bucket.popleft()
+
+    async def get(self):
+        """Remove and return the item with the highest priority; wait until an item is available"""
+        if self._nonempty is None:
+            self._nonempty = asyncio.Event()  # binds the running loop before Python 3.10
+            if self._count:
+                self._nonempty.set()
+        while not self._count:
+            await self._nonempty.wait()
+        return self.get_nowait()
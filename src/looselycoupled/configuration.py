@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import functools
 import logging
 import os
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CDumper as Dumper
+except ImportError:
+    from yaml import SafeLoader, Dumper
+
 
 logger = logging.getLogger(__name__)
 cfg = None
+_MISSING = object()  # sentinel for items not present in the configuration
 
 
 def get_config():
@@ -17,15 +24,21 @@ def get_config():
     return cfg
 
 
+@functools.lru_cache(maxsize=512)
+def _parse_path(itemname):
+    """Returns the parts of a dotted item name as tuples of part and whether it is numeric"""
+    return tuple((part, part.isnumeric()) for part in itemname.split('.'))
+
+
 class Configuration():
     """Class for reading a yaml configuration file"""
-    _cfg = dict()  # the configuration dictionary
-    _filename = 'config.yaml'  # filename to read the configuration from
-    _is_changed = False  # indicates whether the config was changed since loading
+    __slots__ = ('_cfg', '_filename', '_is_changed')
 
     def __init__(self, *args, **kw):
-        pass
-        #self._cfg = dict(*args, **kw);
+        """Instance initialization"""
+        self._cfg = dict()  # the configuration dictionary
+        self._filename = 'config.yaml'  # filename to read the configuration from
+        self._is_changed = False  # indicates whether the config was changed since loading
 
     @property
     def cfg(self):
@@ -58,7 +71,7 @@ class Configuration():
             self.set_filename(filename)
         try:
             with open(self._filename, 'r') as ymlfile:
-                self._cfg = yaml.load(ymlfile, Loader=yaml.SafeLoader)
+                self._cfg = yaml.load(ymlfile, Loader=SafeLoader)
         except FileNotFoundError:
             logger.warning(f'Config file [{self._filename}] not found; just using defaults')
         if self._cfg is None:
@@ -75,7 +88,7 @@ class Configuration():
         logger.info('Saving config file [{0}]'.format(filename))
         try:
             with open(filename, 'w') as ymlfile:
-                yaml.dump(self._cfg, ymlfile, default_flow_style=False)
+                yaml.dump(self._cfg, ymlfile, Dumper=Dumper, default_flow_style=False)
         except OSError as e:
             logger.warning(f'Could not write config file [{filename}], [{str(e)}]')
         self._is_changed = False
@@ -87,22 +100,41 @@ class Configuration():
 
     def get_item(self, itemname, default=None):
         """Return a specific item from the configuration or the provided default value if not present"""
-        parts = itemname.split('.')
-        cfg = self._cfg
-        for part in parts:
-            cfg_new = cfg.get(part, dict())
-            if part.isnumeric() and isinstance(cfg_new, dict) and (len(cfg_new) == 0):
-                cfg_new = cfg.get(float(part), dict())
-            cfg = cfg_new
+        # Fast path for item names with one or two parts that are present as given
+        first, _, rest = itemname.partition('.')
+        if not rest:
+            cfg = self._cfg.get(itemname, _MISSING)
+        elif '.' not in rest:
+            cfg = self._cfg.get(first, _MISSING)
+            if cfg is not _MISSING:
+                cfg = cfg.get(rest, _MISSING)
+        else:
+            cfg = _MISSING
+        if cfg is _MISSING:
+            cfg = self._cfg
+            for part, is_numeric in _parse_path(itemname):
+                cfg_new = cfg.get(part, _MISSING)
+                if (cfg_new is _MISSING) and is_numeric:
+                    cfg_new = cfg.get(float(part), _MISSING)
+                if cfg_new is _MISSING:
+                    return default
+                cfg = cfg_new
         if (cfg is None) or ((isinstance(cfg, dict)) and (len(cfg) == 0)):
             cfg = default
         return cfg
 
     def set_item(self, itemname, value, replace=True):
         """Set a specific item in the configuration"""
-        parts = itemname.split('.')
+        if '.' not in itemname:  # fast path for top-level items
+            if replace:
+                self._cfg[itemname] = value
+            else:
+                self._cfg.setdefault(itemname, value)
+            self._is_changed = True
+            return
+        parts = _parse_path(itemname)
         cfg = self._cfg
-        for i, part in enumerate(parts):
+        for i, (part, _) in enumerate(parts):
             if i + 1 < len(parts):
                 item = cfg.get(part, None)
                 if item is None:  # create hierarchy if not present
@@ -127,12 +159,13 @@ class Configuration():
 
     def delete_item(self, itemname):
         """Deletes the specific item from the configuration"""
-        parts = itemname.split('.')
         cfg = self._cfg
-        for part in parts:
+        for part, _ in _parse_path(itemname):
             cfg_previous = cfg
-            cfg = cfg.get(part, dict())
-        if (cfg is None) or (len(cfg) == 0):
+            cfg = cfg.get(part, _MISSING)
+            if cfg is _MISSING:
+                return False
+        if (cfg is None) or ((isinstance(cfg, dict)) and (len(cfg) == 0)):
             return False
         else:
             del(cfg_previous[part])
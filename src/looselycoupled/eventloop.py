@@ -20,28 +20,30 @@ class EventLoop():
         self._queue = cmdqueue.CmdQueue()
 
     async def process_task(self):
-        """Gets and processes a single task from the queue"""
-        # Get a single item
-        priority, item = await self._queue.get()
-        logger.debug(f'Got item [{item}] from queue')
+        """Gets and processes a single task from the queue; returns False if the event loop shall stop"""
+        # Get a single item (without suspending if one is available already)
+        try:
+            item = self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            item = await self._queue.get()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Got item [%s] from queue', item)
         # Process a single item
         await self._process_item_func(item)
-        self._queue.task_done()
-        # Let other waiting tasks fill the queue again
+        # Let other waiting tasks run (and fill the queue again)
         await asyncio.sleep(0)
         # Trigger event if nothing more is to be done
-        if self._queue.empty() :
+        if self._queue.empty():
             if self._queue_empty_func is not None:
                 if await self._queue_empty_func():
-                    self._running = False        
+                    self._running = False
                     return False
         return True
 
     async def process_queue(self, forever=False):
         """Processes items from the queue until it is empty"""
         while forever or not self._queue.empty():
-            result = await self.process_task()
-            if not result:
+            if not await self.process_task():
                 forever = False
 
     async def run_eventloop(self):
@@ -1,11 +1,29 @@
 # -*- coding: utf-8 -*-
 
-from collections import namedtuple
-import datetime
 import enum
+import time
 
 
-class Priority(enum.Enum):
+_counter = 0  # counter for identifiers
+_last_sec = -1  # second (since the epoch) of the last transaction
+_last_str = ''  # formatted time of the last transaction
+
+
+def _new_transaction():
+    """Returns a new transaction identifier based on current UTC time and a counter"""
+    global _counter, _last_sec, _last_str
+    sec = int(time.time())
+    if _last_sec != sec:
+        # Only format the time once per second (avoids the costly strftime on each call)
+        _last_sec = sec
+        _last_str = '%04d%02d%02d-%02d%02d%02d-' % time.gmtime(sec)[:6]
+        _counter = 0
+    transaction = _last_str + '%06d' % _counter
+    _counter += 1
+    return transaction
+
+
+class Priority(enum.IntEnum):
     HIGHEST = 1
     HIGH = 2
     NORMAL = 3
@@ -13,22 +31,31 @@ class Priority(enum.Enum):
     LOWEST = 5
 
 
-class Metadata(namedtuple('Metadata', ('transaction', 'priority', 'source_obj', 'source_name'))):
+class Metadata():
+    """Information passed along with tasks and events"""
+    __slots__ = ('transaction', 'priority', 'source_obj', 'source_name')
 
-    counter = 0  # counter for identifiers
-    last_time = None  # formatted time of last transaction
-
-    def __new__(cls, transaction=None, priority=None, source_obj=None, source_name=None):
+    def __init__(self, transaction=None, priority=None, source_obj=None, source_name=None):
+        """Instance initialization"""
         # Create a transaction identifier based on current UTC time and a counter
         if transaction is None:
-            formatted_time = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d-%H%M%S')
-            if Metadata.last_time != formatted_time:
-                Metadata.last_time = formatted_time
-                Metadata.counter = 0
-            transaction = formatted_time + f'-{Metadata.counter:06}'
-            Metadata.counter +=1
+            transaction = _new_transaction()
         # Normal priority is default
         if priority is None:
             priority = Priority.NORMAL
-        # Create the named tuple
-        return super(Metadata, cls).__new__(cls, transaction, priority, source_obj, source_name)
+        self.transaction = transaction
+        self.priority = priority
+        self.source_obj = source_obj
+        self.source_name = source_name
+
+    def copy_with_new_transaction(self):
+        """Returns a copy of this metadata with a new transaction identifier"""
+        metadata = Metadata.__new__(Metadata)
+        metadata.transaction = _new_transaction()
+        metadata.priority = self.priority
+        metadata.source_obj = self.source_obj
+        metadata.source_name = self.source_name
+        return metadata
+
+    def __repr__(self):
+        return f'Metadata(transaction={self.transaction!r}, priority={self.priority!r}, source_obj={self.source_obj!r}, source_name={self.source_name!r})'
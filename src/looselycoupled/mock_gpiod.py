@@ -1,35 +1,42 @@
 from collections import namedtuple
+import enum
 import logging
+import os
+import select
 import sys
-import time
+import threading
 
 logger = logging.getLogger(__name__)
-logger.warn('Using gpiod mock!')
+if not os.environ.get('LOOSELYCOUPLED_QUIET_MOCK'):
+    logger.warning('Using gpiod mock!')
 
 try:
     import keyboard
 except ImportError:
-    logger.warn('Python module [keyboard] not installed; checking on keyboad events will not be possible')
+    logger.warning('Python module [keyboard] not installed; checking on keyboad events will not be possible')
 
 
 class Event(namedtuple('Event', ('event_type', 'line_offset', 'line_seqno'))):
-    class Type:
+    class Type(enum.IntEnum):
         RISING_EDGE = 1
         FALLING_EDGE = 2
 
 
 class line:
-    class Direction:
-        INPUT = None
-        OUTPUT = None
-    class Edge:
-        BOTH = None
-    class Bias:
-        PULL_DOWN = None
-        PULL_UP = None
-    class Value:
-        ACTIVE = 1
+    class Direction(enum.IntEnum):
+        INPUT = 1
+        OUTPUT = 2
+    class Edge(enum.IntEnum):
+        NONE = 0
+        RISING = 1
+        FALLING = 2
+        BOTH = 3
+    class Bias(enum.IntEnum):
+        PULL_UP = 1
+        PULL_DOWN = 2
+    class Value(enum.IntEnum):
         INACTIVE = 0
+        ACTIVE = 1
 
 
 class Chip():
@@ -45,34 +52,65 @@ class LineRequest:
     def __init__(self, *args, **kwargs):
         self.key_pressed = False
         self.key_event = False
+        self.lock = threading.Lock()
+        # Provide a file descriptor that gets readable on (keyboard) events like the one of gpiod
+        self._fd_read, self._fd_write = os.pipe()
+        os.set_blocking(self._fd_read, False)
+        self._hooks = []  # keyboard hooks (removed on release)
+        if 'keyboard' in sys.modules:
+            self._hooks.append(keyboard.on_press_key('esc', lambda _: self.on_key(True)))
+            self._hooks.append(keyboard.on_release_key('esc', lambda _: self.on_key(False)))
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
         return False
 
+    @property
+    def fd(self):
+        return self._fd_read
+
+    def on_key(self, pressed):
+        with self.lock:
+            if self._fd_write is None:  # already released
+                return
+            if self.key_pressed != pressed:
+                self.key_pressed = pressed
+                self.key_event = True
+                os.write(self._fd_write, b'\x01')
+
+    def release(self):
+        # Remove the keyboard hooks first so that they don't write to the closed pipe
+        while self._hooks:
+            keyboard.unhook(self._hooks.pop())
+        with self.lock:
+            if self._fd_read is not None:
+                os.close(self._fd_read)
+                os.close(self._fd_write)
+                self._fd_read = self._fd_write = None
+
     def wait_edge_events(self, *args, **kwargs):
-        if (timeout := kwargs.get('timeout')) is not None:
-            if 'keyboard' in sys.modules:
-                if self.key_pressed != keyboard.is_pressed('escape'):
-                    self.key_pressed = keyboard.is_pressed('escape')
-                    self.key_event = True
-                    return True
+        timeout = kwargs.get('timeout', args[0] if args else None)
+        readable, _, _ = select.select([self._fd_read], [], [], timeout)
+        return bool(readable)
+
+    def read_edge_events(self, max_events=None):
+        with self.lock:
+            try:
+                os.read(self._fd_read, 64)
+            except BlockingIOError:
+                pass
+            if self.key_event:
+                self.key_event = False  # clear event
+                event = Event(Event.Type.RISING_EDGE if self.key_pressed else Event.Type.FALLING_EDGE, 22, 0)
+                return [ event ]
             else:
-                time.sleep(timeout)
-        return False
-
-    def read_edge_events(self):
-        if self.key_event:
-            self.key_event = False  # clear event
-            event = Event(self.key_pressed, 22, 0)
-            return [ event ]
-        else:
-            return []
+                return []
 
     def set_values(self, outputs_new):
-        logger.info(f'Setting outputs to [{outputs_new}]')
+        logger.info('Setting outputs to [%s]', outputs_new)
 
 
 class LineSettings():
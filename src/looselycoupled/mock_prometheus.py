@@ -1,9 +1,11 @@
 import logging
+import os
 import time
 
 
 logger = logging.getLogger(__name__)
-logger.warn('Using prometheus-client mock! Install "prometheus-client" package to change this.')
+if not os.environ.get('LOOSELYCOUPLED_QUIET_MOCK'):
+    logger.warning('Using prometheus-client mock! Install "prometheus-client" package to change this.')
 
 
 CONTENT_TYPE_LATEST = 'text/plain'
@@ -22,18 +22,55 @@ class States(enum.Enum):
     active = 3  # ready for receiving and sending event notifications
 
 
+class StateEvent(threading.Event):
+    """Event that threads can wait for (wait) as well as coroutines (async_wait); set and cleared in the event loop"""
+
+    def __init__(self):
+        """Instance initialization"""
+        super().__init__()
+        self._async_event = None  # created on first use within the event loop (binds the loop before Python 3.10)
+
+    def set(self):
+        super().set()
+        if self._async_event is not None:
+            self._async_event.set()
+
+    def clear(self):
+        super().clear()
+        if self._async_event is not None:
+            self._async_event.clear()
+
+    async def async_wait(self):
+        """Waits for the event without blocking the event loop"""
+        if self._async_event is None:
+            self._async_event = asyncio.Event()
+            if self.is_set():
+                self._async_event.set()
+        await self._async_event.wait()
+        return True
+
+
 class Module():
     """Application module (abstract class)"""
 
     def __init__(self, name, function_references):
         """Instance initialization"""
         self._name = name
+        self._qualified_prefix = name + '.'  # prefix for tasks of this module
+        self._qualified_tasks = dict()  # task -> task qualified by module name
+        self._default_event = name + '_event'  # event triggered if no event name is given
         self._function_references = function_references
         self._task_passive = None
         self._task_active = None
+        self._loop = None  # event loop the module runs in (known after startup)
         self._state = States.inactive
-        self.event_no_longer_active = threading.Event()
-        self.event_no_longer_passive = threading.Event()
+        self._is_ready = False  # cached state checks, maintained by the state setter
+        self._is_active = False
+        self._method_cache = dict()  # methodname -> (method, is_coroutine)
+        self._config_keys = dict()  # itemname -> qualified configuration item name
+        self.allows_direct_calls = type(self).call_method is Module.call_method  # whether methods may be called without call_method (not overridden)
+        self.event_no_longer_active = StateEvent()
+        self.event_no_longer_passive = StateEvent()
 
     def get_method(self, methodname):
         """Returns a reference to the method with the given name"""
@@ -43,10 +80,22 @@ class Module():
             method = None
         return method
 
+    def get_method_info(self, methodname):
+        """Returns the method with the given name (None if unknown) and whether it is a coroutine function (cached once found)"""
+        try:
+            return self._method_cache[methodname]
+        except KeyError:
+            method = self.get_method(methodname)
+            info = (method, inspect.iscoroutinefunction(method))
+            if method is not None:  # unknown methods are looked up again as they may get added later
+                self._method_cache[methodname] = info
+            return info
+
     async def call_method(self, methodname, log_unknown=True, **kwargs):
         """Calles the method of this object instance with the given name and arguments; optionally logs if method unknown"""
-        if (method := self.get_method(methodname)) is not None:
-            if inspect.iscoroutinefunction(method):
+        method, is_coroutine = self.get_method_info(methodname)
+        if method is not None:
+            if is_coroutine:
                 return await method(**kwargs)
             else:
                 return method(**kwargs)
@@ -54,56 +103,71 @@ class Module():
             if log_unknown:
                 logger.error(f'Called method [{methodname}] unknown in module [{self.name}]')
 
+    def _ensure_metadata(self, kwargs):
+        """Adds metadata originating from this module to the provided arguments if not present"""
+        if kwargs.get('metadata') is None:
+            kwargs['metadata'] = Metadata(source_obj=self, source_name=self._name)
+
+    def _qualify_task(self, task):
+        """Returns the task qualified by the name of this module if it is a local one"""
+        try:
+            return self._qualified_tasks[task]
+        except KeyError:
+            qualified = task if '.' in task else self._qualified_prefix + task
+            self._qualified_tasks[task] = qualified
+            return qualified
+
     async def exec_task(self, task, **kwargs):
         """Helper method for synchronous execution of a task"""
-        if not 'metadata' in kwargs:
-            kwargs['metadata'] = Metadata(source_obj=self, source_name=self.name)
+        self._ensure_metadata(kwargs)
         return await self._function_references.exec_task(task, **kwargs)
 
     def exec_task_threadsafe(self, task, **kwargs):
-        """Helper method for synchronous execution of a task"""
-        if not 'metadata' in kwargs:
-            kwargs['metadata'] = Metadata(source_obj=self, source_name=self._name)
+        """Helper method for synchronous execution of a task from another thread; on the event loop thread, use exec_task instead"""
+        self._ensure_metadata(kwargs)
         return self._function_references.exec_task_threadsafe(task, **kwargs)
 
     async def enqueue_task(self, task, **kwargs):
         """Helper method to queue a task for asynchronous execution"""
         if not self.is_active:
-            logger.warn(f'Module not active when enqueuing task [{task}]')
-        if '.' not in task:
-            task = self._name + '.' + task
-        if not 'metadata' in kwargs:
-            kwargs['metadata'] = Metadata(source_obj=self, source_name=self._name)
+            logger.warning(f'Module not active when enqueuing task [{task}]')
+        task = self._qualify_task(task)
+        self._ensure_metadata(kwargs)
         return await self._function_references.enqueue_task(task, **kwargs)
 
     def enqueue_task_threadsafe(self, task, **kwargs):
         """Helper method to queue a task for asynchronous execution"""
         if not self.is_active:
-            logger.warn(f'Module not active when enqueuing task [{task}]')
-        if '.' not in task:
-            task = self._name + '.' + task
-        if not 'metadata' in kwargs:
-            kwargs['metadata'] = Metadata(source_obj=self, source_name=self._name)
+            logger.warning(f'Module not active when enqueuing task [{task}]')
+        task = self._qualify_task(task)
+        self._ensure_metadata(kwargs)
         return self._function_references.enqueue_task_threadsafe(task, **kwargs)
 
+    async def enqueue_tasks(self, items, metadata=None):
+        """Helper method to queue several tasks (tuples of task and arguments dictionary) sharing the same metadata"""
+        if not self.is_active:
+            logger.warning(f'Module not active when enqueuing tasks [{[task for task, _ in items]}]')
+        if metadata is None:
+            metadata = Metadata(source_obj=self, source_name=self._name)
+        batch = [(self._qualify_task(task), kwargs) for task, kwargs in items]
+        return await self._function_references.enqueue_task_batch(batch, metadata)
+
     async def trigger_event(self, event=None, **kwargs):
         """Helper method to trigger an event asynchronously"""
         if not self.is_active:
-            logger.warn(f'Module not active when triggering event [{event}]')
+            logger.warning(f'Module not active when triggering event [{event}]')
         if event is None:
-            event = self._name + '_event'
-        if not 'metadata' in kwargs:
-            kwargs['metadata'] = Metadata(source_obj=self, source_name=self._name)
+            event = self._default_event
+        self._ensure_metadata(kwargs)
         await self._function_references.trigger_event(event, **kwargs)
 
     def trigger_event_threadsafe(self, event=None, **kwargs):
         """Helper method to trigger an event asynchronously"""
         if not self.is_active:
-            logger.warn(f'Module not active when triggering event [{event}]')
+            logger.warning(f'Module not active when triggering event [{event}]')
         if event is None:
-            event = self._name + '_event'
-        if not 'metadata' in kwargs:
-            kwargs['metadata'] = Metadata(source_obj=self, source_name=self._name)
+            event = self._default_event
+        self._ensure_metadata(kwargs)
         self._function_references.trigger_event_threadsafe(event, **kwargs)
 
     def is_ready_module(self, modulename):
@@ -116,7 +180,11 @@ class Module():
 
     def get_config(self, itemname, default=None):
         """Return a configuration item"""
-        return cfg.get_item(self._name + '.' + itemname, default)
+        try:
+            key = self._config_keys[itemname]
+        except KeyError:
+            key = self._config_keys.setdefault(itemname, self._qualified_prefix + itemname)
+        return cfg.get_item(key, default)
 
     async def run_passively(self, metadata):
         """Runs the module, process tasks/events (initiate new tasks/events only for handling them)"""
@@ -149,6 +217,7 @@ class Module():
 
     async def startup(self, metadata):
         """Initialization of the module (get config)"""
+        self._loop = asyncio.get_running_loop()
         await self.initialize()
         self.event_no_longer_passive.clear()        
         # asyncio.create_task(self._run_passively()) with exception handling:        
@@ -170,7 +239,7 @@ class Module():
         """Shutdown the module (prepare/initiate shutdown; trigger stopping of "passive" coroutine)"""
         # Latest now, the "active" coroutine must have finished
         if self._task_active is not None:
-            asyncio.gather(self._task_active, return_exceptions=True)
+            await asyncio.gather(self._task_active, return_exceptions=True)
             self._task_active = None
         # We're going into "inactive" state now
         self.state = States.inactive
@@ -181,13 +250,17 @@ class Module():
         assert self._task_active is None
         # Latest now, the "passive" coroutine must have finished
         if self._task_passive is not None:
-            asyncio.gather(self._task_passive, return_exceptions=True)
+            await asyncio.gather(self._task_passive, return_exceptions=True)
             self._task_passive = None
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def loop(self):
+        return self._loop
+
     @property
     def state(self):
         return self._state
@@ -195,12 +268,14 @@ class Module():
     @state.setter
     def state(self, newstate):
         self._state = newstate
+        self._is_ready = (newstate == States.passive) or (newstate == States.active)
+        self._is_active = (newstate == States.active)
         logger.debug(f'New state [{newstate}] for module [{self._name}]')
 
     @property
     def is_ready(self):
-        return (self.state == States.passive) or (self.state == States.active)
+        return self._is_ready
 
     @property
     def is_active(self):
-        return self.state == States.active
+        return self._is_active
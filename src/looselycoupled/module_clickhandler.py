@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
-from collections import defaultdict
 import enum
 import logging
 import time
@@ -11,6 +10,9 @@ from looselycoupled import module
 
 logger = logging.getLogger(__name__)
 
+_DOUBLECLICK_GAP_NS = 500_000_000  # maximum time between release and second push of a doubleclick
+_LONG_PRESS_NS = 1_000_000_000  # minimum duration of a long push
+
 
 class State(enum.Enum):
     """Enum class for keeping state info"""
@@ -21,17 +23,27 @@ class State(enum.Enum):
     HOLD = 4  # still pushed
 
 
+# State transitions by (state, rising_edge): new state, name of event to be triggered, description
+_TRANSITIONS = {
+    (State.NEUTRAL, True): (State.PUSHED, None, None),
+    (State.RELEASED, True): (State.PUSHEDAGAIN, None, None),
+    (State.PUSHED, False): (State.RELEASED, 'pushed_short', 'pushed short'),
+    (State.HOLD, False): (State.NEUTRAL, 'pushed_long', 'pushed long'),
+    (State.PUSHEDAGAIN, False): (State.NEUTRAL, 'doubleclick', 'doubleclick'),
+}
+
+
 class ItemState():
     """Class for keeping state of a tracked item"""
-    _state = None  # state info
-    ts_pushed = None  # timestamp when item got pushed
-    ts_released = None  # timestamp when item got released
+    __slots__ = ('_state', 'ts_pushed', 'ts_released', 'line', 'line_name')
 
     def __init__(self):
         """Object initialization"""
-        self._state = State.NEUTRAL
-        self.ts_pushed = None
-        self.ts_released = None
+        self._state = State.NEUTRAL  # state info
+        self.ts_pushed = None  # timestamp when item got pushed (monotonic, nanoseconds)
+        self.ts_released = None  # timestamp when item got released (monotonic, nanoseconds)
+        self.line = None  # line offset of the item
+        self.line_name = None  # line name of the item
 
     def update_state(self, line, line_name, rising_edge):
         self.line = line
@@ -39,37 +51,22 @@ class ItemState():
         if rising_edge:
             # If new button push is long after last release, we start independently anew
             if self.state == State.RELEASED:
-                if self.ts_pushed - self.ts_released > 0.5:
+                if self.ts_pushed - self.ts_released > _DOUBLECLICK_GAP_NS:
                     self.state = State.NEUTRAL
-            # State transitions
-            if self.state == State.NEUTRAL:
-                self.state = State.PUSHED
-            elif self.state == State.RELEASED:
-                self.state = State.PUSHEDAGAIN
-            else:
-                logger.warn(f'Unexpected state [{self.state}] for rising edge')
         else:
-            # No doubleclick if second push is too long
-            if self.state == State.PUSHEDAGAIN:
-                if self.ts_released - self.ts_pushed > 1:
-                    self.state = State.PUSHED
-            # State transitions
-            if self.state == State.PUSHED:
-                if self.ts_released - self.ts_pushed <= 1:
-                    self.state = State.RELEASED
-                    logger.info(f'Line [{line_name}:{line}] pushed short')
-                    return 'pushed_short'
-                else:
-                    self.state = State.NEUTRAL
-                    logger.info(f'Line [{line_name}:{line}] pushed long')
-                    return 'pushed_long'
-            elif self.state == State.PUSHEDAGAIN:
-                self.state = State.NEUTRAL
-                logger.info(f'Line [{line_name}:{line}] doubleclick')
-                return 'doubleclick'
-            else:
-                logger.warn(f'Unexpected state [{self.state}] for rising edge')
-        return None
+            # A push that is too long is no click (and no doubleclick)
+            if self.state in (State.PUSHED, State.PUSHEDAGAIN):
+                if self.ts_released - self.ts_pushed > _LONG_PRESS_NS:
+                    self.state = State.HOLD
+        # State transitions
+        transition = _TRANSITIONS.get((self.state, rising_edge))
+        if transition is None:
+            logger.warning('Unexpected state [%s] for %s edge', self.state, 'rising' if rising_edge else 'falling')
+            return None
+        self.state, event_name, description = transition
+        if event_name is not None:
+            logger.info('Line [%s:%s] %s', line_name, line, description)
+        return event_name
 
     @property
     def state(self):
@@ -77,19 +74,19 @@ class ItemState():
 
     @state.setter
     def state(self, value):
-        logger.debug(f'State change for line [{self.line}] from [{self._state}] to [{value}]')
+        logger.debug('State change for line [%s] from [%s] to [%s]', self.line, self._state, value)
         self._state = value
 
 
 class ModuleClickHandler(module.Module):
     """Application module for generating click events based on rising and falling edges"""
-    items = None  # items to be tracked
+    items = None  # items to be tracked (by line)
     inversed_logic = None  # list of items with inversed logic
 
     async def initialize(self):
         """Module initialization"""
         # Initialize data structures
-        self.items = defaultdict(ItemState)
+        self.items = dict()
         self.inversed_logic = []
 
     async def set_inversed_logic(self, metadata=None, inversed_logic=[]):
@@ -100,13 +97,20 @@ class ModuleClickHandler(module.Module):
         """React on received input event"""
         if line in self.inversed_logic:
             rising_edge = not rising_edge
-        item = self.items[(line, line_name)]
+        item = self.items.get(line)
+        if item is None:
+            item = self.items[line] = ItemState()
         if rising_edge:
-            item.ts_pushed = time.time()
+            item.ts_pushed = time.monotonic_ns()
         else:
-            item.ts_released = time.time()
+            item.ts_released = time.monotonic_ns()
         if event_name := item.update_state(line, line_name, rising_edge):
             await self.trigger_event(event_name, metadata=metadata, line=line, line_name=line_name, line_seq=line_seq)
+
+    async def on_changed_gpio_input_batch(self, metadata, events):
+        """React on received batch of input events (tuples of line, line_name, line_seq, rising_edge)"""
+        for line, line_name, line_seq, rising_edge in events:
+            await self.on_changed_gpio_input(metadata, line, line_name, line_seq, rising_edge)
             
 
 module_class = ModuleClickHandler
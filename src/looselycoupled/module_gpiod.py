@@ -1,21 +1,28 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+import concurrent.futures
+import datetime
 import enum
+import itertools
 import logging
-import threading
-import time
+import types
 
 try:
     import gpiod
 except ModuleNotFoundError:
     from looselycoupled import mock_gpiod as gpiod
 
-from looselycoupled import module_threaded
+from looselycoupled import module
 
 
 logger = logging.getLogger(__name__)
 
+_ACTIVE = gpiod.line.Value.ACTIVE
+_INACTIVE = gpiod.line.Value.INACTIVE
+_VALUE_BY_BOOL = (_INACTIVE, _ACTIVE)  # output value indexed by whether the output is active
+_EDGE_EVENT_BUFFER_SIZE = 64  # number of edge events buffered by the kernel and read at once
+
 
 class OutputState(enum.Enum):
     """Enum class for defining output states"""
@@ -28,39 +35,47 @@ class OutputState(enum.Enum):
     ON = 6
 
 
+_OFF = OutputState.OFF
+_ON = OutputState.ON
+
+
 class Output():
     """Class for keeping the state of an output"""
+    __slots__ = ('line', 'outputs', 'state', 'value', 'value_new')
 
-    def __init__(self, line_offset):
+    def __init__(self, line_offset, outputs):
         """Instance initialization"""        
         self.line = line_offset  # line identifier (BCM pin number)
-        self.state = OutputState.OFF  # high-level state: Off/Blink*/On
-        self.value = gpiod.line.Value.INACTIVE  # current output value
-        self.value_new = gpiod.line.Value.INACTIVE  # new output value to be provisioned
+        self.outputs = outputs  # Outputs object this output belongs to
+        self.state = _OFF  # high-level state: Off/Blink*/On
+        self.value = _INACTIVE  # current output value
+        self.value_new = _INACTIVE  # new output value to be provisioned
 
     def set_state(self, state_new):
         """Sets the output state for the given line"""
         if self.state != state_new:
+            by_state = self.outputs.by_state
+            by_state[self.state].discard(self.line)
+            by_state[state_new].add(self.line)
             self.state = state_new
-            if state_new == OutputState.OFF:
+            if state_new is _OFF:
                 self.set_output_value(False)
-            elif state_new == OutputState.ON:
+            elif state_new is _ON:
                 self.set_output_value(True)
-            else:  # blink
-                # Change something immediately to indicate state change to the user
-                self.toggle_value()
+            # When blinking, the module aligns the value with the current phase of the blink rhythm
 
     def set_output_value(self, active):
-        """Sets the output value of the given line"""
-        value_new = gpiod.line.Value.ACTIVE if active else gpiod.line.Value.INACTIVE
-        self.value_new = value_new
+        """Sets the output value of the given line (active must be a bool)"""
+        value_new = _VALUE_BY_BOOL[active]
+        if value_new is not self.value_new:  # values are singletons, so compare identities
+            # Keep track of the outputs with pending changes
+            if value_new is not self.value:
+                self.outputs.dirty.add(self.line)
+            else:
+                self.outputs.dirty.discard(self.line)
+            self.value_new = value_new
         return value_new
 
-    def toggle_value(self):
-        """Toggles the given output and returns the new value"""
-        value_new = (self.value == gpiod.line.Value.INACTIVE)
-        return self.set_output_value(value_new)
-
 
 class Outputs(dict):
     """Class for keeping the state of all considered outputs as a dictionary of Output objects"""
@@ -68,31 +83,40 @@ class Outputs(dict):
     def __init__(self, line_offsets):
         """Instance initialization"""
         super().__init__()
+        self.dirty = set()  # lines of the outputs with a new value to be provisioned
+        self.by_state = { state: set() for state in OutputState }  # lines of the outputs per output state
+        self.changes = dict()  # changed values (reused on each call of get_changes_and_apply)
         for line_offset in line_offsets:
-            self[line_offset] = Output(line_offset)
+            self[line_offset] = Output(line_offset, self)
+            self.by_state[_OFF].add(line_offset)
 
     def get_changes_and_apply(self):
-        """Makes the new values current and returns a dictionary of changes values"""
-        outputs_new = dict()
-        for line, output in self.items():
-            if output.value != output.value_new:                
-                output.value = output.value_new
-                outputs_new[line] = output.value_new
-        return outputs_new
+        """Makes the new values current and returns a dictionary of changed values (None if nothing changed; the dictionary is reused by the next call)"""
+        if not self.dirty:
+            return None
+        changes = self.changes
+        changes.clear()
+        for line in self.dirty:
+            output = self[line]
+            output.value = value = output.value_new
+            changes[line] = value
+        self.dirty.clear()
+        return changes
 
 
 class BlinkRhythm():
     """Class for keeping infos about a blink rhythm"""
-    time_off = 0  # off time in milliseconds
-    time_on = 0  # on time in milliseconds
-    time_remaining = 0 #  time until next toggle in milliseconds
+    time_off = 0  # off time in nanoseconds
+    time_on = 0  # on time in nanoseconds
 
     def __init__(self, time_off, time_on):
-        """Object initialization"""
+        """Object initialization (times given in milliseconds)"""
         self.active = False
-        self.time_off = time_off
-        self.time_on = time_on
-        self.time_remaining = time_off
+        self.time_off = time_off * 1_000_000
+        self.time_on = time_on * 1_000_000
+        self.deadline = 0  # time of the next toggle (event loop time in nanoseconds)
+        self.handle = None  # timer handle for the next toggle
+        self.lines = ()  # lines of the outputs blinking in this rhythm (while started)
 
 
 class BlinkRhythms(dict):
@@ -106,87 +130,93 @@ class BlinkRhythms(dict):
         self[OutputState.BLINK] = BlinkRhythm(1200, 1200)
         self[OutputState.BLINK_FAST] = BlinkRhythm(800, 800)
         self[OutputState.BLINK_VERYFAST] = BlinkRhythm(400, 400)
+        self._loop = None
+        self._outputs = None
+        self._notify = None
+
+    def start(self, loop, outputs, notify):
+        """Starts toggling the outputs of each rhythm by timers of the given event loop; notify is called on changes"""
+        self._loop = loop
+        self._outputs = outputs
+        self._notify = notify
+        now = int(loop.time() * 1_000_000_000)
+        for id, rhythm in self.items():
+            rhythm.lines = outputs.by_state[id]  # kept up to date by the outputs
+            rhythm.deadline = now + rhythm.time_off
+            rhythm.handle = loop.call_at(rhythm.deadline / 1_000_000_000, self.toggle, rhythm)
 
-    def get_time_wakeup(self):
-        """Gets the time in milliseconds until the next wakeup for toggling"""
-        time_wakeup = 1000  # wake up after 1s at latest
+    def stop(self):
+        """Stops all timers"""
         for rhythm in self.values():
-            blinktime = rhythm.time_remaining
-            if blinktime > 0:
-                time_wakeup = min(time_wakeup, blinktime)
-        return time_wakeup
-
-    def elapse_time(self, ms, outputs):
-        """Lets the given number of milliseconds pass and toggles outputs if needed"""
-        for id, rhythm in self.items():
-            if rhythm.time_remaining > 0:
-                blinktime = rhythm.time_on if rhythm.active else rhythm.time_off
-                toggle = False
-                if ms > rhythm.time_remaining:
-                    logger.warning(f'Elapsed time [{ms} ms] is greater than expected next wakeup time [{rhythm.time_remaining} ms]')
-                    rhythm.time_remaining = 0
-                    toggle = True
-                else:
-                    rhythm.time_remaining -= ms  # elapse time
-                    toggle = (rhythm.time_remaining <= 0)
-                if toggle:
-                    rhythm.active = not rhythm.active
-                    for line, output in outputs.items():
-                        if output.state == id:
-                            outputs[line].set_output_value(rhythm.active)
-                    rhythm.time_remaining = rhythm.time_on if rhythm.active else rhythm.time_off
-
-
-class ModuleGpiod(module_threaded.ModuleThreaded):
+            if rhythm.handle is not None:
+                rhythm.handle.cancel()
+                rhythm.handle = None
+            rhythm.lines = ()
+
+    def toggle(self, rhythm):
+        """Toggles the outputs of the given rhythm and schedules the next toggle (called by the event loop)"""
+        rhythm.active = active = not rhythm.active
+        outputs = self._outputs
+        for line in rhythm.lines:
+            outputs[line].set_output_value(active)
+        # Schedule relative to the planned time to avoid drift
+        rhythm.deadline += rhythm.time_on if active else rhythm.time_off
+        rhythm.handle = self._loop.call_at(rhythm.deadline / 1_000_000_000, self.toggle, rhythm)
+        if outputs.dirty:
+            self._notify()
+
+
+def _normalize_lines(lines, create_settings):
+    """Returns a read-only mapping of line offset tuples to line settings; a list of line offsets gets settings created by the given function"""
+    if isinstance(lines, list):
+        lines = { tuple(sorted(lines)): create_settings() } if lines else {}
+    return types.MappingProxyType(dict(lines))
+
+
+class ModuleGpiod(module.Module):
     """Application module for accessing GPIOs using the gpiod library"""
 
-    async def initialize(self, chip_name='/dev/gpiochip0', input_lines=[], output_lines=[], line_names=[]):
-        """Module initialization"""
+    async def initialize(self, chip_name='/dev/gpiochip0', input_lines=[], output_lines=[], line_names=[], batch_events=False):
+        """Module initialization (with batch_events, all edge events read at once are sent as a single event)"""
         # Get object for accessing the GPIO chip
-        logger.info(f'Accessing GPIO chip [{chip_name}]')
+        logger.info('Accessing GPIO chip [%s]', chip_name)
         self.chip = gpiod.Chip(chip_name)
         # If just line offsets are provided (as a list), take default values for the lines
-        if isinstance(input_lines, list):
-            input_lines = { tuple(input_lines): gpiod.LineSettings(
-                              direction=gpiod.line.Direction.INPUT,
-                              edge_detection=gpiod.line.Edge.BOTH,
-                              bias=gpiod.line.Bias.PULL_UP,
-                              debounce_period=datetime.timedelta(milliseconds=10)
-                            )
-                          }
-        if isinstance(output_lines, list):                          
-            output_lines = { tuple(output_lines): gpiod.LineSettings(
-                               direction=gpiod.line.Direction.OUTPUT,
-                               output_value=gpiod.line.Value.INACTIVE
-                             )
-                           }
+        input_lines = _normalize_lines(input_lines, lambda: gpiod.LineSettings(
+                                                        direction=gpiod.line.Direction.INPUT,
+                                                        edge_detection=gpiod.line.Edge.BOTH,
+                                                        bias=gpiod.line.Bias.PULL_UP,
+                                                        debounce_period=datetime.timedelta(milliseconds=10)
+                                                    ))
+        output_lines = _normalize_lines(output_lines, lambda: gpiod.LineSettings(
+                                                          direction=gpiod.line.Direction.OUTPUT,
+                                                          output_value=_INACTIVE
+                                                      ))
         # Initialize data structures
         self.blinkrhythms = BlinkRhythms()
         self.input_lines = input_lines
         self.output_lines = output_lines
-        self.line_names = line_names
-        self.outputs = Outputs(self.get_key_list(output_lines)) 
-        self.event_wakeup_output = threading.Event()
+        self.line_names = types.MappingProxyType(dict(line_names))  # a list of (line, name) tuples may be provided as well
+        self._name_to_line = { name: line for line, name in self.line_names.items() }
+        self.batch_events = batch_events
+        self.outputs = Outputs(self.get_key_list(output_lines))
+        self._all_off = dict.fromkeys(self.outputs, _INACTIVE)  # values for switching off all outputs
+        self.event_wakeup_output = asyncio.Event()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='gpiod')  # for blocking gpiod calls
+        self.input_request = None  # line request for the input lines while active
 
     def get_key_list(self, d):
         """Returns a list of dictionary keys (the keys can be tuples or scalar values)"""
-        l = []
-        for item in d.keys():
-            if isinstance(item, tuple):
-                l.extend(item)
-            else:
-                l.append(item)
-        return l
+        return list(itertools.chain.from_iterable(item if isinstance(item, tuple) else (item,) for item in d))
 
     def get_line_byname(self, line):
         """Gets line number by line number or line name"""
-        if isinstance(line, str):
-            try:
-                # Get key of "line_names" dictionary by value
-                line = list(self.line_names.keys())[list(self.line_names.values()).index(line)]
-            except ValueError:
-                raise ValueError(f'Line name [{line}] unknown')    
-        return line
+        if isinstance(line, int):  # fast path for line offsets (including IntEnum constants)
+            return line
+        try:
+            return self._name_to_line[line]
+        except KeyError:
+            raise ValueError(f'Line name [{line}] unknown')
 
     async def get_output_state(self, line):
         """Get the state of the output with the specified line offset"""
@@ -196,53 +226,99 @@ class ModuleGpiod(module_threaded.ModuleThreaded):
         except KeyError:
             raise ValueError(f'Output line [{line}] not handled')
 
-    async def set_output_state(self, metadata, line, state_new):
-        """Set output state"""
+    def _set_state(self, output, state_new):
+        """Sets the state of the given output; a blinking output joins the current phase of its rhythm right away"""
+        output.set_state(state_new)
+        rhythm = self.blinkrhythms.get(state_new)
+        if rhythm is not None:
+            output.set_output_value(rhythm.active)
+
+    def _apply_state(self, line, state_new):
+        """Sets the state of the output with the specified line offset or name and notifies the output change"""
         line = self.get_line_byname(line)
-        if line not in self.outputs.keys():
+        try:
+            output = self.outputs[line]
+        except KeyError:
             raise ValueError(f'Output line [{line}] not handled')
-        self.outputs[line].set_state(state_new)
+        self._set_state(output, state_new)
         self.event_wakeup_output.set()  # notify the output change
 
+    async def set_output_state(self, metadata, line, state_new):
+        """Set output state"""
+        self._apply_state(line, state_new)
+
+    async def set_output_states(self, metadata, states):
+        """Set the states of several outputs at once (dictionary of line and state)"""
+        outputs = []
+        for line, state_new in states.items():
+            line = self.get_line_byname(line)
+            if line not in self.outputs:
+                raise ValueError(f'Output line [{line}] not handled')
+            outputs.append((self.outputs[line], state_new))
+        for output, state_new in outputs:
+            self._set_state(output, state_new)
+        self.event_wakeup_output.set()  # notify the output changes
+
     async def toggle_output_state(self, metadata, line):
         """Toggles the state of the output with the specified line offset"""
-        line = self.get_line_byname(line)
         state = await self.get_output_state(line)
         state_new = OutputState.ON if (state == OutputState.OFF) else OutputState.OFF
-        await self.set_output_state(line, state_new)
+        self._apply_state(line, state_new)
 
-    def thread_run_passively(self):
-        """Thread for controlling output lines"""
+    async def run_passively(self, metadata):
+        """Controls the output lines until the module shuts down"""
         with self.chip.request_lines(consumer='looselycoupled-gpiod-out', config=self.output_lines) as request:
+            self.blinkrhythms.start(self.loop, self.outputs, self.event_wakeup_output.set)
             while not self.event_no_longer_passive.is_set():
-                # Sleep until next output toggle takes place or event is fired
-                start_time = time.time()
-                wakeup_ms = self.blinkrhythms.get_time_wakeup()
-                event_occurred = self.event_wakeup_output.wait(timeout=wakeup_ms/1000)
-                if event_occurred:
-                    elapsed_time = time.time() - start_time
-                    wakeup_ms = min(wakeup_ms, int(elapsed_time * 1000))
-                    logger.debug(f'Woke up early after [{wakeup_ms}] due to notification')
-                self.blinkrhythms.elapse_time(wakeup_ms, self.outputs)
+                # Sleep until outputs got changed by a blink rhythm or a new output state
+                await self.event_wakeup_output.wait()
+                self.event_wakeup_output.clear()
                 # Apply changes output values
                 outputs_new = self.outputs.get_changes_and_apply()
-                if len(outputs_new):
-                    request.set_values(outputs_new)
-                # Clear event to be able to set it again
-                self.event_wakeup_output.clear()
+                if outputs_new:
+                    await self.loop.run_in_executor(self.executor, request.set_values, outputs_new)
             # Finally switch off everything
-            outputs_new = { line: gpiod.line.Value.INACTIVE for line, output in self.outputs.items() }
-            request.set_values(outputs_new)
-
-    def thread_run(self):
-        """Thread for monitoring input lines"""
-        with self.chip.request_lines(consumer='looselycoupled-gpiod-in', config=self.input_lines) as request:
-            while not self.event_no_longer_active.is_set():
-                time.sleep(0.01)  # collect events for 10ms before listening (to reduce processing overhead)
-                if request.wait_edge_events(timeout=1):
-                    events = request.read_edge_events()
-                    for event in events:
-                        rising_edge = (event.event_type == event.Type.RISING_EDGE)
-                        line_name = self.line_names.get(event.line_offset)
-                        logger.info(f"Input event on line [{line_name}:{event.line_offset}:{event.line_seqno}]: {'rising edge' if rising_edge else 'falling edge'}")
-                        self.trigger_event_threadsafe('changed_gpio_input', line=event.line_offset, line_name=line_name, line_seq={event.line_seqno}, rising_edge=rising_edge)
+            self.blinkrhythms.stop()
+            await self.loop.run_in_executor(self.executor, request.set_values, self._all_off)
+        self.executor.shutdown(wait=False)
+
+    async def run(self, metadata):
+        """Monitors input lines by watching the file descriptor of the line request in the event loop"""
+        if not self.input_lines:
+            return
+        self.input_request = self.chip.request_lines(consumer='looselycoupled-gpiod-in', config=self.input_lines, event_buffer_size=_EDGE_EVENT_BUFFER_SIZE)
+        self.loop.add_reader(self.input_request.fd, self.on_input_readable)
+
+    def on_input_readable(self):
+        """Reads the pending edge events of the input lines (called by the event loop)"""
+        events = self.input_request.read_edge_events(max_events=_EDGE_EVENT_BUFFER_SIZE)
+        task = self.loop.create_task(self.handle_edge_events(events))
+        self.register_task(task, name=f'{self.name}.handle_edge_events')
+
+    async def handle_edge_events(self, events):
+        """Triggers a single batch event for the provided edge events or an event for each of them"""
+        batch = []
+        get_line_name = self.line_names.get
+        for event in events:
+            rising_edge = (event.event_type == event.Type.RISING_EDGE)
+            line_name = get_line_name(event.line_offset)
+            logger.info('Input event on line [%s:%s:%s]: %s', line_name, event.line_offset, event.line_seqno, 'rising edge' if rising_edge else 'falling edge')
+            if self.batch_events:
+                batch.append((event.line_offset, line_name, event.line_seqno, rising_edge))
+            else:
+                await self.trigger_event('changed_gpio_input', line=event.line_offset, line_name=line_name, line_seq=event.line_seqno, rising_edge=rising_edge)
+        if batch:
+            await self.trigger_event('changed_gpio_input_batch', events=batch)
+
+    async def deactivate(self, metadata):
+        """Stops monitoring input lines"""
+        if self.input_request is not None:
+            self.loop.remove_reader(self.input_request.fd)
+            self.input_request.release()
+            self.input_request = None
+        await super().deactivate(metadata)
+
+    async def initiate_shutdown(self, metadata):
+        """Initiates shutdown and wakes up output control to let it finish"""
+        await super().initiate_shutdown(metadata)
+        self.event_wakeup_output.set()
@@ -11,11 +11,14 @@
 
 import asyncio
 import base64
+import hmac
 import logging
 import http.server
 import os
+import selectors
 import ssl
 import threading
+import time
 
 try:
     import prometheus_client
@@ -28,47 +31,41 @@ from looselycoupled import module_threaded
 
 logger = logging.getLogger(__name__)
 cfg = configuration.get_config()
+_AUTH_HEADER_MAXLEN = 512  # longer authorization headers are rejected without further checks
+_SERVER_STOP_TIMEOUT = 5  # seconds to wait for the server thread to stop on shutdown
 
 
 class HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
-    """Request handler for service metrics requests"""
-
-    def __init__(self, lock, *args, **kwargs):
-        """Instance initialization"""
-        self.lock = lock
-        self.username = cfg.get_item('prometheus.username')  # credentials for basic auth
-        self.password = cfg.get_item('prometheus.password')
-        if (self.username is not None) and (self.password is not None):
-            logger.info('Using basic authentication for serving metric data')
-        super().__init__(*args, **kwargs)
+    """Request handler for service metrics requests (the server provides the module and the expected authorization)"""
 
     def do_GET(self):
         """Handle GET requests"""
         # Handle authentication
-        if (self.username is not None) and (self.password is not None):
+        auth_expected = self.server.auth_expected
+        if auth_expected is not None:
             # Perform basic authentication
             auth_header = self.headers.get('Authorization')
-            if auth_header is None:
+            if (auth_header is None) or (len(auth_header) > _AUTH_HEADER_MAXLEN) or (not auth_header.startswith('Basic ')):
+                # Request basic authentication (cheap rejection of missing, implausible or other authentication)
                 self.send_response(401)
                 self.send_header('WWW-Authenticate', 'Basic realm="Metrics"')
                 self.end_headers()
                 return
 
-            # Verify credentials
-            auth_type, credentials = auth_header.split(' ')
-            username, password = base64.b64decode(credentials).decode().split(':')
-            if (auth_type != 'Basic') or (username != self.username) or (password != self.password):
+            # Verify credentials (in constant time)
+            if not hmac.compare_digest(auth_header.encode(), auth_expected):
                 self.send_response(403)
                 self.end_headers()
-                self.wfile.write(b'Invalid authentication type or invalid credentials.')
+                self.wfile.write(b'Invalid credentials.')
                 return
         # Serve metrics
         if self.path == '/metrics':
+            data = self.server.module.get_metrics_data()
             self.send_response(200)
             self.send_header('Content-Type', prometheus_client.CONTENT_TYPE_LATEST)
+            self.send_header('Content-Length', str(len(data)))
             self.end_headers()
-            with self.lock:
-                self.wfile.write(prometheus_client.generate_latest())
+            self.wfile.write(data)
         else:
             self.send_response(404)
             self.end_headers()
@@ -80,39 +77,65 @@ class ModulePrometheus(module_threaded.ModuleThreaded):
 
     async def initialize(self):
         """Module initialization"""
-        self.lock = threading.Lock()
+        self.lock = threading.Lock()  # for modifying metrics
+        self.render_lock = threading.Lock()  # for serializing metric data
         self.metrics = dict()
+        self.label_children = dict()  # (metric, label items) -> metric child for these label values
+        self.scrape_cache = None  # tuple of timestamp and serialized metric data
+        self.scrape_cache_ttl = cfg.get_item('prometheus.scrape_cache_ttl', 0.25)  # seconds to reuse serialized metric data (updates show up after at most that time)
+        self._stop_r, self._stop_w = os.pipe()  # pipe for waking up the server thread on shutdown
+        # Credentials for basic auth
+        username = cfg.get_item('prometheus.username')
+        password = cfg.get_item('prometheus.password')
+        if (username is not None) and (password is not None):
+            logger.info('Using basic authentication for serving metric data')
+            self.auth_expected = b'Basic ' + base64.b64encode(f'{username}:{password}'.encode())
+        else:
+            self.auth_expected = None
 
     async def set_gauge_value(self, metadata, metric, **kwargs):
         """Set metric value of type Gauge after ensuring metric exists"""
         # Check arguments for labels etc.
-        documentation = '[no documentation provided]'
+        documentation = kwargs.pop('documentation', '[no documentation provided]')
+        value = kwargs.pop('value', None)
         labels = dict()
-        value = None
         for key, data in kwargs.items():
-            if key.startswith('label_'):
-                labels[key[6:]] = data
-            elif key == 'documentation':
-                documentation = data
-            elif key == 'value':
-                value = data
-            else:
-                raise ValueError(f'Unexpected argument [{key}={value}]')
+            if key[:6] != 'label_':
+                raise ValueError(f'Unexpected argument [{key}={data}]')
+            labels[key[6:]] = data
         # Create metric if not yet present and finally set value
         with self.lock:
             if metric not in self.metrics:
                 self.metrics[metric] = prometheus_client.Gauge(metric, documentation, labels.keys())
             if value:
                 if len(labels):
-                    self.metrics[metric].labels(**labels).set(value)
+                    key = (metric, tuple(labels.items()))
+                    child = self.label_children.get(key)
+                    if child is None:
+                        child = self.label_children[key] = self.metrics[metric].labels(**labels)
+                    child.set(value)
                 else:
                     self.metrics[metric].set(value)
 
+    def get_metrics_data(self):
+        """Returns the serialized metric data (reused for a short time to serve multiple scrapes)"""
+        cache = self.scrape_cache  # published as a whole, so it can be read without locking
+        now = time.monotonic()
+        if (cache is None) or (now - cache[0] > self.scrape_cache_ttl):
+            with self.render_lock:
+                cache = self.scrape_cache
+                if (cache is None) or (now - cache[0] > self.scrape_cache_ttl):  # not yet renewed by another thread
+                    cache = (now, prometheus_client.generate_latest())
+                    self.scrape_cache = cache
+        return cache[1]
+
     def thread_run_passively(self):
         """Thread for serving http requests"""
         # Initialization
         port = cfg.get_item('prometheus.port', 9090)
-        httpd = http.server.HTTPServer(('0.0.0.0', port), lambda *args, **kwargs: HTTPRequestHandler(self.lock, *args, **kwargs))
+        httpd = http.server.ThreadingHTTPServer(('0.0.0.0', port), HTTPRequestHandler)
+        httpd.module = self  # module providing the metric data
+        httpd.auth_expected = self.auth_expected  # expected authorization header for basic auth (None if not used)
         # Handle SSL/TLS if key files are present
         keyfile = cfg.get_item('prometheus.keyfile', os.path.join(cfg.filedir, 'prometheus_key.pem'))
         certfile = cfg.get_item('prometheus.certfile', os.path.join(cfg.filedir, 'prometheus_cert.pem'))
@@ -122,15 +145,40 @@ class ModulePrometheus(module_threaded.ModuleThreaded):
             ssl_context.load_cert_chain(keyfile=keyfile, certfile=certfile)
             httpd.socket = ssl_context.wrap_socket(httpd.socket, server_side=True)
         else:
-            logger.warn(f'Not using SSL/TLS as both the keyfile [{keyfile}] and the certfile [{certfile}] need to be present')
+            logger.warning(f'Not using SSL/TLS as both the keyfile [{keyfile}] and the certfile [{certfile}] need to be present')
         logger.info(f'Starting metrics server on port {port}')
-        # Server requests until application needs to quit
-        httpd.timeout = 1  # set a timeout for periodic stop checks
+        # Server requests until application needs to quit (signalled via the stop pipe)
+        httpd.timeout = 0  # only handle requests when the socket is known to be readable
         try:
-            while not self.event_no_longer_passive.is_set():
-                httpd.handle_request()
+            with selectors.DefaultSelector() as selector:
+                selector.register(httpd, selectors.EVENT_READ)
+                selector.register(self._stop_r, selectors.EVENT_READ)
+                try:
+                    while not self.event_no_longer_passive.is_set():
+                        for key, _ in selector.select():
+                            if key.fileobj is httpd:
+                                httpd.handle_request()
+                finally:
+                    selector.unregister(self._stop_r)
+                    selector.unregister(httpd)
         finally:
             httpd.server_close()
 
+    async def initiate_shutdown(self, metadata):
+        """Shutdown the module (and wake up the server thread to let it stop)"""
+        await super().initiate_shutdown(metadata)
+        os.write(self._stop_w, b'\x01')
+
+    async def finalize_shutdown(self, metadata):
+        """Shutdown the module (cleanup activities)"""
+        # The server thread must have stopped using the stop pipe before closing it
+        stopped = await self.wait_for_thread('thread_run_passively', timeout=_SERVER_STOP_TIMEOUT)
+        await super().finalize_shutdown(metadata)
+        if stopped:
+            os.close(self._stop_r)
+            os.close(self._stop_w)
+        else:
+            logger.warning('Metrics server thread did not stop in time; not closing its stop pipe')
+
 
 module_class = ModulePrometheus
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+import concurrent.futures
 import logging
 from looselycoupled import module
 
@@ -10,6 +11,8 @@ logger = logging.getLogger(__name__)
 
 class ModuleThreaded(module.Module):
     """Extension of application module to support running in separate threads"""
+    _executor = None  # thread pool for the module's threads (one for the passive and one for the active thread)
+    _threads = None  # method name -> future of the thread executing it
 
     def run_as_thread(self, method_name):
         """Runs the specified method in a separate thread and registers it as task"""
@@ -19,9 +22,21 @@ class ModuleThreaded(module.Module):
             method = None
         if method is not None:
             logger.debug(f'Starting separate thread for executing [{method_name}]...')
-            coro_output = asyncio.to_thread(method)
-            task_output = asyncio.create_task(coro_output)
-            self.register_task(task_output, name=f'{self.name}.{method_name} (separate thread)')
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix=self.name)
+            future_output = self.loop.run_in_executor(self._executor, method)
+            if self._threads is None:
+                self._threads = dict()
+            self._threads[method_name] = future_output
+            self.register_task(future_output, name=f'{self.name}.{method_name} (separate thread)')
+
+    async def wait_for_thread(self, method_name, timeout=None):
+        """Waits for the thread executing the specified method to finish; returns whether it is finished (or was never started)"""
+        future = None if self._threads is None else self._threads.get(method_name)
+        if future is None:
+            return True
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+        return bool(done)
 
     async def run_passively(self, metadata):
         """Runs the module, process tasks/events (initiate new tasks/events only for handling them)"""
@@ -30,3 +45,10 @@ class ModuleThreaded(module.Module):
     async def run(self, metadata):
         """Runs the module, may actively initiate new tasks/events"""
         self.run_as_thread('thread_run')
+
+    async def finalize_shutdown(self, metadata):
+        """Shutdown the module (cleanup activities)"""
+        await super().finalize_shutdown(metadata)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
-from collections import namedtuple, OrderedDict
+from collections import deque, namedtuple
+import concurrent.futures
 import datetime
+import functools
 import importlib
 import logging
 import signal
@@ -10,39 +12,54 @@ import sys
 import threading
 import traceback
 
+try:
+    import uvloop
+except ModuleNotFoundError:
+    uvloop = None
+
 from . import eventloop
 from .metadata import Metadata
 from .monitoredthreadpoolexecutor import MonitoredThreadPoolExecutor
 
 
 logger = logging.getLogger(__name__)
+_TASK_SLOT_WAIT = 2  # seconds to wait for a free task slot before starting a task anyway
 
 
 class ModuleManager(object):
     """Class to handle modules"""
-    _modules = OrderedDict()  # Dictionary of module data
+    _modules = dict()  # Dictionary of module data
 
-    def __init__(self, appmodules, exception_path=None, asyncio_debug=None, max_workers=None):
+    def __init__(self, appmodules, exception_path=None, asyncio_debug=None, max_workers=None, use_uvloop=True):
         """Initialization"""
         self._exception_path = exception_path
+        self._exception_file = None  # file for logging exceptions (opened on the first exception)
+        self._exception_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='exceptions')  # for writing exception info off the event loop
         self._asyncio_debug = asyncio_debug
         self._max_workers = max_workers
-        self._modules = OrderedDict()
-        self._thread_reference = threading.current_thread() 
-        self._running_tasks = dict()
-        self._finished_tasks = dict()
+        self._use_uvloop = use_uvloop and (uvloop is not None)  # use uvloop only if requested and installed
+        self._modules = dict()
+        self._task_slot_limit = 0  # number of scheduled tasks that may run before starting further tasks is deferred
+        self._task_slots = None  # semaphore for limiting the number of scheduled tasks (created when running)
+        self._loop_thread_ident = threading.get_ident()  # identifier of the thread running the event loop
+        self._running_tasks = dict()  # task -> name
+        self._no_running_tasks = None  # event set whenever there are no running tasks (created when running)
         self._exit = False
+        self._inbox = deque()  # tasks for synchronous execution handed over by other threads (appending is threadsafe)
+        self._inbox_notified = False  # whether the event loop is already notified to drain the inbox
+        self._metadata = Metadata(source_obj=self, source_name='modulemanager')  # template for metadata of the module manager
         self.register_modules(appmodules)
 
     def create_metadata(self):
         """Create a new metadata object"""
-        return Metadata(source_obj=self, source_name='modulemanager')
+        return self._metadata.copy_with_new_transaction()
 
     def register_module(self, modulename, moduleunit):
         """Register a module"""
         module = moduleunit.module_class
         module_obj = module(modulename, self.function_references)
         self._modules[modulename] = module_obj
+        self._task_slot_limit = 3 * len(self._modules)  # adapt rule if needed
 
     def register_modules(self, appmodules):
         """Register all modules in the provided dictionary"""
@@ -62,50 +79,81 @@ class ModuleManager(object):
 
     def task_done_callback(self, task):
         """React on a finished coroutine"""
-        self._finished_tasks[task] = self._running_tasks[task]
-        del self._running_tasks[task]        
-        try:
-            task.result()
-        except Exception as e:
-            # Print exceptions and log to file
+        self._running_tasks.pop(task, None)
+        if not self._running_tasks:
+            self._no_running_tasks.set()
+        if task.cancelled():
+            return
+        e = task.exception()
+        if e is not None:
             logger.critical(f'Exception occured: [{str(e)}]')
-            logger.exception('Exception info:')  # just error but prints traceback
-            if self._exception_path is not None:
-                with open(self._exception_path, 'a') as handle:
-                    handle.write(datetime.datetime.now().isoformat(sep=' '))
-                    handle.write('\n')
-                    traceback.print_exc(file=handle)
-                    handle.write('\n')                
+            self._exception_executor.submit(self.write_exception, e, datetime.datetime.now())
+
+    def write_exception(self, e, timestamp):
+        """Print exception info and log it to file (called in a separate thread)"""
+        logger.error('Exception info:', exc_info=e)  # just error but prints traceback
+        if self._exception_path is not None:
+            handle = self._exception_file
+            if handle is None:
+                handle = self._exception_file = open(self._exception_path, 'a', buffering=1)  # line-buffered, kept open
+            handle.write(timestamp.isoformat(sep=' '))
+            handle.write('\n')
+            traceback.print_exception(type(e), e, e.__traceback__, file=handle)
+            handle.write('\n')
 
     def register_task(self, task, name='[unnamed]'):
         """Register a task for exception handling and management"""
         self._running_tasks[task] = name
+        self._no_running_tasks.clear()
         task.add_done_callback(self.task_done_callback)
 
+    def task_slot_done_callback(self, task):
+        """Release the task slot held by a finished coroutine"""
+        self._task_slots.release()
+
+    async def acquire_task_slot(self, taskinfo):
+        """Acquires a slot for starting a task, waiting for a limited time; returns whether a slot was acquired"""
+        if not self._task_slots.locked():
+            return await self._task_slots.acquire()  # returns immediately
+        logger.info(f'Waiting for free slot before starting the next task [{taskinfo}]')
+        try:
+            await asyncio.wait_for(self._task_slots.acquire(), timeout=_TASK_SLOT_WAIT)
+        except asyncio.TimeoutError:
+            logger.warning(f'Starting the next task [{taskinfo}] after a long wait; check reasons for long running tasks')
+            return False  # don't wait indefinitely
+        logger.debug('Waiting done')
+        return True
+
+    async def schedule_task(self, coro, taskinfo):
+        """Runs the coroutine as a registered task once a task slot is available"""
+        has_slot = await self.acquire_task_slot(taskinfo)
+        return self.start_task(coro, taskinfo, has_slot)
+
+    def start_task(self, coro, taskinfo, has_slot):
+        """Runs the coroutine as a registered task (releasing the task slot when done if one is held)"""
+        task = asyncio.create_task(coro)
+        self.register_task(task, name=taskinfo)
+        if has_slot:
+            task.add_done_callback(self.task_slot_done_callback)
+        return task
+
+    def get_method_call(self, module, methodname, log_unknown, kwargs):
+        """Returns a coroutine calling the method of the module (directly if it is a coroutine function and the module allows it)"""
+        if module.allows_direct_calls:
+            method, is_coroutine = module.get_method_info(methodname)
+            if is_coroutine:
+                return method(**kwargs)
+        return module.call_method(methodname, log_unknown, **kwargs)
+
     async def schedule_method(self, module, methodname, log_unknown=True, **kwargs):
         """Call a method asynchronously as a separate asyncio coroutine"""
-        methodinfo = f'{module.name}.{methodname}({str(kwargs)})'
-
-        async def wait_for_free_task_slot():
-            wait_condition = lambda: len(self._running_tasks) > 3 * len(self._modules)  # adapt rule if needed
-            if wait_condition():
-                logger.info(f'Waiting for free slot before starting the next task [{methodinfo}]')
-                sleeptime = 0.001  # start with one millisecond
-                while wait_condition():
-                    await asyncio.sleep(sleeptime)
-                    if sleeptime < 1:
-                        sleeptime *= 2  # double sleeptime in each iteration
-                    else:
-                        logger.warning(f'Starting the next task [{methodinfo}] after a long wait; check reasons for long running tasks')
-                        break  # don't wait indefinitely
-                logger.debug('Waiting done')
-
-        if module.get_method(methodname) is not None:
-            logger.debug(f'Scheduling method call asynchronously [{methodinfo}]')
-            await wait_for_free_task_slot()
-            task = asyncio.create_task(module.call_method(methodname, log_unknown, **kwargs))
-            self.register_task(task, name=methodinfo)
-            return task
+        if module.get_method_info(methodname)[0] is not None:
+            if logger.isEnabledFor(logging.DEBUG):
+                methodinfo = f'{module.name}.{methodname}({str(kwargs)})'
+                logger.debug('Scheduling method call asynchronously [%s]', methodinfo)
+            else:
+                methodinfo = module.name + '.' + methodname  # avoid formatting the arguments if not needed
+            return await self.schedule_task(self.get_method_call(module, methodname, log_unknown, kwargs), methodinfo)
         else:
             if log_unknown:
                 logger.error(f'Called method [{methodname}] unknown in module [{module.name}]')
@@ -113,7 +161,7 @@ class ModuleManager(object):
 
     async def exec_task_internal(self, target, metadata, asynchronous=False, **kwargs):
         """Execute the specified task (target specifies the method to be called) synchronously with the given arguments"""
-        logger.debug(f'Executing task [{target}({str(kwargs)})]')
+        logger.debug('Executing task [%s(%s)]', target, kwargs)
         modulename, _, methodname = target.partition('.')
         if not self.is_ready_module(modulename):
             logger.error(f'Method module [{target}] is in an inactive state or unknown module was tried to be called')
@@ -127,82 +175,158 @@ class ModuleManager(object):
                 await self.schedule_method(module, methodname, **kwargs)
                 return False            
             else:
-                return await module.call_method(methodname, **kwargs)
+                if module.allows_direct_calls:
+                    method, is_coroutine = module.get_method_info(methodname)
+                    if method is not None:
+                        return (await method(**kwargs)) if is_coroutine else method(**kwargs)
+                return await module.call_method(methodname, **kwargs)  # also logs unknown methods
 
     def exec_task_threadsafe(self, target, metadata, asynchronous=False, **kwargs):
         """Execute a task while ensuring that no other task is running in parallel"""
-        logger.debug(f'Executing task [{target}({str(kwargs)})] in a threadsafe manner')
-        task = asyncio.run_coroutine_threadsafe(self.exec_task_internal(target, metadata, asynchronous, **kwargs), self.loop)
-        result = task.result()  # this will block until the result is available
+        logger.debug('Executing task [%s(%s)] in a threadsafe manner', target, kwargs)
+        if threading.get_ident() == self._loop_thread_ident:
+            raise RuntimeError(f'Blocking execution of task [{target}] from within the event loop thread; use exec_task instead')
+        future = concurrent.futures.Future()
+        self._inbox.append((future, target, metadata, asynchronous, kwargs))
+        if not self._inbox_notified:  # wake up the event loop only once for a burst of tasks
+            self._inbox_notified = True
+            self.loop.call_soon_threadsafe(self.drain_inbox)
+        result = future.result()  # this will block until the result is available
         return result
 
+    def drain_inbox(self):
+        """Start executing the tasks handed over by other threads (called in the event loop)"""
+        self._inbox_notified = False  # reset before draining so that tasks added meanwhile trigger another notification
+        inbox = self._inbox
+        while inbox:
+            future, target, metadata, asynchronous, kwargs = inbox.popleft()
+            task = self.loop.create_task(self.exec_task_internal(target, metadata, asynchronous, **kwargs))
+            task.add_done_callback(functools.partial(self.inbox_task_done_callback, future))
+
+    @staticmethod
+    def inbox_task_done_callback(future, task):
+        """Pass the outcome of a task handed over by another thread to the waiting thread"""
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
     async def exec_task(self, target, metadata, asynchronous=False, **kwargs):
         """Execute the specified task (target specifies the method to be called) synchronously with the given arguments, getting a lock if needed"""
-        if self._thread_reference == threading.current_thread():
+        if threading.get_ident() == self._loop_thread_ident:
             return await self.exec_task_internal(target, metadata, asynchronous, **kwargs)
         else:
             return self.exec_task_threadsafe(target, metadata, asynchronous, **kwargs)
 
     async def enqueue_task_internal(self, target, metadata, **kwargs):
         """Enqueue the provided task for asynchronous execution"""
-        logger.debug(f'Enqueuing task [{target}({str(kwargs)})]')
-        await self._eventloop.queue.put(target=target, metadata=metadata, kwargs=kwargs)
+        logger.debug('Enqueuing task [%s(%s)]', target, kwargs)
+        self._eventloop.queue.put_nowait(target=target, metadata=metadata, kwargs=kwargs)
 
     def enqueue_task_threadsafe(self, target, metadata, **kwargs):
         """Enqueue the provided task for asynchronous execution"""
-        logger.debug(f'Enqueuing task [{target}({str(kwargs)})] in a threadsafe manner')
+        logger.debug('Enqueuing task [%s(%s)] in a threadsafe manner', target, kwargs)
+        if threading.get_ident() == self._loop_thread_ident:  # no need to hand over to the event loop thread
+            self._eventloop.queue.put_nowait(target=target, metadata=metadata, kwargs=kwargs)
+            return
         asyncio.run_coroutine_threadsafe(self.enqueue_task_internal(target=target, metadata=metadata, **kwargs), self.loop)
 
     async def enqueue_task(self, target, metadata, **kwargs):
         """Enqueue the provided task for asynchronous execution"""
-        if self._thread_reference == threading.current_thread():
+        if threading.get_ident() == self._loop_thread_ident:
             return await self.enqueue_task_internal(target=target, metadata=metadata, **kwargs)
         else:
             return self.enqueue_task_threadsafe(target=target, metadata=metadata, **kwargs)
 
+    async def enqueue_task_batch_internal(self, batch, metadata):
+        """Enqueue the provided tasks (tuples of target and arguments dictionary) for asynchronous execution"""
+        logger.debug('Enqueuing batch of tasks [%s]', batch)
+        put_nowait = self._eventloop.queue.put_nowait
+        for target, kwargs in batch:
+            put_nowait(target=target, metadata=metadata, kwargs=kwargs)
+
+    def enqueue_task_batch_threadsafe(self, batch, metadata):
+        """Enqueue the provided tasks for asynchronous execution"""
+        logger.debug('Enqueuing batch of tasks [%s] in a threadsafe manner', batch)
+        if threading.get_ident() == self._loop_thread_ident:  # no need to hand over to the event loop thread
+            put_nowait = self._eventloop.queue.put_nowait
+            for target, kwargs in batch:
+                put_nowait(target=target, metadata=metadata, kwargs=kwargs)
+            return
+        asyncio.run_coroutine_threadsafe(self.enqueue_task_batch_internal(batch=batch, metadata=metadata), self.loop)
+
+    async def enqueue_task_batch(self, batch, metadata):
+        """Enqueue the provided tasks for asynchronous execution"""
+        if threading.get_ident() == self._loop_thread_ident:
+            return await self.enqueue_task_batch_internal(batch=batch, metadata=metadata)
+        else:
+            return self.enqueue_task_batch_threadsafe(batch=batch, metadata=metadata)
+
     async def trigger_event_internal(self, event, metadata, **kwargs):
         """Enqueue the provided event for asynchronous event handling"""
         target = 'on_' + event
-        logger.debug(f'Triggering event target [{target}({str(kwargs)})]')        
-        await self._eventloop.queue.put(target=target, metadata=metadata, kwargs=kwargs)
+        logger.debug('Triggering event target [%s(%s)]', target, kwargs)
+        self._eventloop.queue.put_nowait(target=target, metadata=metadata, kwargs=kwargs)
 
     def trigger_event_threadsafe(self, event, metadata, **kwargs):
         """Enqueue the provided event for asynchronous event handling"""
-        logger.debug(f'Triggering event [{event}({str(kwargs)})] in a threadsafe manner')
+        logger.debug('Triggering event [%s(%s)] in a threadsafe manner', event, kwargs)
+        if threading.get_ident() == self._loop_thread_ident:  # no need to hand over to the event loop thread
+            self._eventloop.queue.put_nowait(target='on_' + event, metadata=metadata, kwargs=kwargs)
+            return
         asyncio.run_coroutine_threadsafe(self.trigger_event_internal(event=event, metadata=metadata, **kwargs), self.loop)
 
     async def trigger_event(self, event, metadata, **kwargs):
         """Enqueue the provided event for asynchronous event handling"""
-        if self._thread_reference == threading.current_thread():
+        if threading.get_ident() == self._loop_thread_ident:
             return await self.trigger_event_internal(event=event, metadata=metadata, **kwargs)
         else:
             return self.trigger_event_threadsafe(event=event, metadata=metadata, **kwargs)
 
     async def broadcast_event_internal(self, event, metadata, asynchronous=True, **kwargs):
         """Immediately send the specified event with the given arguments to all participants with a matching event handler"""
-        logger.debug(f'Broadcasting event [{event}({str(kwargs)})')
-        for modulename, module_obj in self._modules.items():
-            if metadata.source_obj != module_obj:  # split horizon, don't provide event to source
-                kwargs['metadata'] = metadata
-                if asynchronous:
-                    await self.schedule_method(module_obj, event, log_unknown=False, **kwargs)
-                else:
+        debug = logger.isEnabledFor(logging.DEBUG)  # checked once as broadcasting is on the hot path
+        if debug:
+            logger.debug('Broadcasting event [%s(%s)]', event, kwargs)
+        kwargs['metadata'] = metadata
+        if asynchronous:
+            # Schedule the event handlers of all receivers at once (waiting for a task slot at most once per broadcast)
+            receivers = [module_obj for module_obj in self._modules.values()
+                         if (metadata.source_obj != module_obj) and (module_obj.get_method_info(event)[0] is not None)]  # split horizon, don't provide event to source
+            if receivers:
+                eventinfo = f'{event}({str(kwargs)})' if debug else event  # avoid formatting the arguments if not needed
+                has_slot = await self.acquire_task_slot(eventinfo)
+                for i, module_obj in enumerate(receivers):
+                    if i:  # further receivers only take a slot if one is free right away
+                        has_slot = (not self._task_slots.locked()) and (await self._task_slots.acquire())
+                    self.start_task(self.get_method_call(module_obj, event, False, kwargs), f'{module_obj.name}.{eventinfo}', has_slot)
+        else:
+            # Call the event handlers one after the other (in the order of module registration)
+            for module_obj in self._modules.values():
+                if metadata.source_obj != module_obj:  # split horizon, don't provide event to source
                     await module_obj.call_method(event, log_unknown=False, **kwargs)
         if event == 'on_exit':
             logger.info('Shutting down after on_exit event notification...')
             self._exit = True
-            await self.broadcast_event_internal('deactivate', metadata=self.create_metadata(), asynchronous=False)
-            await self.broadcast_event_internal('initiate_shutdown', metadata=self.create_metadata(), asynchronous=False)
-            await self.broadcast_event_internal('finalize_shutdown', metadata=self.create_metadata(), asynchronous=False)
+            metadata = self.create_metadata()  # the shutdown steps form a single transaction
+            await self.broadcast_event_internal('deactivate', metadata=metadata, asynchronous=False)
+            await self.broadcast_event_internal('initiate_shutdown', metadata=metadata, asynchronous=False)
+            await self.broadcast_event_internal('finalize_shutdown', metadata=metadata, asynchronous=False)
 
     def broadcast_event_threadsafe(self, event, metadata, asynchronous=True, **kwargs):
         """Handle an event while ensuring that no other task is running in parallel"""
-        logger.debug(f'Broadcasting event [{event}({str(kwargs)})] in a threadsafe manner')
-        asyncio.run_coroutine_threadsafe(self.broadcast_event_internal(event=event, metadata=metadata, asynchronous=asynchronous, **kwargs), self.loop)
+        logger.debug('Broadcasting event [%s(%s)] in a threadsafe manner', event, kwargs)
+        coro = self.broadcast_event_internal(event=event, metadata=metadata, asynchronous=asynchronous, **kwargs)
+        if threading.get_ident() == self._loop_thread_ident:  # no need to hand over to the event loop thread
+            self.register_task(self.loop.create_task(coro), name=f'broadcast of event [{event}]')
+        else:
+            asyncio.run_coroutine_threadsafe(coro, self.loop)
 
     async def broadcast_event(self, event, metadata, asynchronous=True, **kwargs):
         """Handle an event, getting a lock if needed"""
-        if self._thread_reference == threading.current_thread():
+        if threading.get_ident() == self._loop_thread_ident:
             return await self.broadcast_event_internal(event=event, metadata=metadata, asynchronous=asynchronous, **kwargs)
         else:
             return self.broadcast_event_threadsafe(event=event, metadata=metadata, asynchronous=asynchronous, **kwargs)
@@ -214,17 +338,11 @@ class ModuleManager(object):
         else:
             await self.broadcast_event(event=item.target, metadata=item.metadata, **(item.kwargs))
 
-    async def gather_finished_tasks(self):
-        """Gather all finished tasks"""
-        await asyncio.gather(*(self._finished_tasks.keys()), return_exceptions=True)
-        self._finished_tasks.clear()
-
     async def queue_empty(self):
         """React on empty event queue"""
-        await self.gather_finished_tasks()  # clean up finished stuff
         await self.broadcast_event('becoming_idle', metadata=self.create_metadata())
         if self._exit:
-            await asyncio.gather(*(self._running_tasks.keys()), return_exceptions=True)
+            await self._no_running_tasks.wait()
             if not len(self._running_tasks):
                 return True
         return False
@@ -232,32 +350,44 @@ class ModuleManager(object):
     async def maintask(self):
         """Main task handling the lifecycle"""
         # Create and start event loop
+        # Create asyncio primitives within the running loop (they are bound to the loop on creation before Python 3.10)
+        self._task_slots = asyncio.BoundedSemaphore(max(1, self._task_slot_limit))
+        self._no_running_tasks = asyncio.Event()
+        if not self._running_tasks:
+            self._no_running_tasks.set()
         self._eventloop = eventloop.EventLoop(self.process_item, self.queue_empty)
         task_eventloop = asyncio.create_task(self._eventloop.run_eventloop())
         # Initialize modules
         await self.broadcast_event_internal('startup', metadata=self.create_metadata(), asynchronous=False)
-        logger.debug(f'Startup done; application-wide scheduled tasks: {self.get_running_task_names()}')
+        logger.debug('Startup done; application-wide scheduled tasks: %s', self.get_running_task_names())
         await asyncio.sleep(0)  # let other tasks run first (not really needed but makes sense)
         await self.broadcast_event_internal('activate', metadata=self.create_metadata(), asynchronous=False)
-        logger.debug(f'Activation done; application-wide scheduled tasks: {self.get_running_task_names()}')
+        logger.debug('Activation done; application-wide scheduled tasks: %s', self.get_running_task_names())
         await asyncio.sleep(0)  # let other tasks run first (not really needed but makes sense)
         # Wait for the event loop to terminate
         await task_eventloop
-        logger.debug(f'Event loop ended')
-        # Final clean-up
-        await self.gather_finished_tasks()
+        logger.debug('Event loop ended')
+
+    def on_signal(self, signum, frame):
+        """React on a received operating system signal (fallback if the event loop can't handle signals)"""
+        self.loop.call_soon_threadsafe(self.on_signal_in_loop, signum)
 
-    def on_signal(self, signum, handler):
-        """React on a received operating system signal"""
-        raise(KeyboardInterrupt)  # react on signal like as with a keyboard interrupt
+    def on_signal_in_loop(self, signum):
+        """React on a received operating system signal (called in the event loop)"""
+        logger.info(f'Signal [{signal.Signals(signum).name}] received. Exiting...')
+        # Shutdown by broadcasting shutdown event
+        self.trigger_event_threadsafe(event='exit', metadata=self.create_metadata())
 
     def run(self):
         """Run the program"""
-        # Register signal handler
-        signal.signal(signal.SIGINT, self.on_signal)
-        signal.signal(signal.SIGTERM, self.on_signal)
-        # Run asyncio loop
-        loop = self.loop = asyncio.new_event_loop()
+        # Create asyncio loop (use the faster uvloop implementation if installed and not disabled)
+        loop = self.loop = uvloop.new_event_loop() if self._use_uvloop else asyncio.new_event_loop()
+        # Register signal handlers
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.on_signal_in_loop, signum)
+            except NotImplementedError:  # e.g. on Windows
+                signal.signal(signum, self.on_signal)
         if self._asyncio_debug is not None:
             loop.set_debug(enabled=self._asyncio_debug)
         #loop.slow_callback_duration = <duration>
@@ -265,17 +395,7 @@ class ModuleManager(object):
            loop.set_default_executor(MonitoredThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='asyncio'))
         try:
             asyncio.set_event_loop(loop)
-            maintask = loop.create_task(self.maintask())
-            done = False
-            while not done:
-                try:
-                    loop.run_until_complete(maintask)
-                    done = True
-                except KeyboardInterrupt:
-                    logger.info('Keyboard interrupt received. Exiting...')
-                    # Shutdown by broadcasting shutdown event
-                    task = loop.create_task(self.trigger_event(event='exit', metadata=self.create_metadata()))
-                    self.register_task(task, name='triggering of exit event')
+            loop.run_until_complete(self.maintask())
             logger.debug('Asyncio event-loop complete')
             tasks = asyncio.all_tasks(loop)
             for task in tasks:
@@ -285,6 +405,10 @@ class ModuleManager(object):
             logger.debug('Asyncio event-loop stopped')            
         finally:
             loop.close()
+            self._exception_executor.shutdown(wait=True)  # let pending exception info get written
+            if self._exception_file is not None:
+                self._exception_file.close()
+                self._exception_file = None
 
     @property
     def function_references(self):
@@ -292,6 +416,7 @@ class ModuleManager(object):
         FunctionReferences = namedtuple('FunctionReferences', [
             'trigger_event', 'trigger_event_threadsafe', 
             'enqueue_task', 'enqueue_task_threadsafe',
+            'enqueue_task_batch',
             'exec_task', 'exec_task_threadsafe',
             'broadcast_event', 
             'schedule_method', 
@@ -301,6 +426,7 @@ class ModuleManager(object):
         return FunctionReferences(
             self.trigger_event, self.trigger_event_threadsafe, 
             self.enqueue_task, self.enqueue_task_threadsafe,
+            self.enqueue_task_batch,
             self.exec_task, self.exec_task_threadsafe,
             self.broadcast_event, 
             self.schedule_method, 
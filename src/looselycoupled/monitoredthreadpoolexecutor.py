@@ -1,5 +1,6 @@
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+import itertools
 import logging
 import threading
 
@@ -12,23 +13,24 @@ class MonitoredThreadPoolExecutor(ThreadPoolExecutor):
 
     def __init__(self, *args, **kwargs):
         """Object initialization"""
-        super().__init__(*args, **kwargs)
-        self._max_workers = kwargs.get('max_workers', 0)
-        self._current_workers = 0
-        self._lock = threading.Lock()
+        super().__init__(*args, **kwargs)  # sets self._max_workers to the resolved number of workers
+        self._monitored = (args[0] if args else kwargs.get('max_workers')) is not None  # only monitor an explicitly given number of workers
+        self._submitted = itertools.count(1)  # counts submitted jobs (advancing the counter is atomic)
+        self._completed_lock = threading.Lock()  # done callbacks run in the worker threads
+        self._completed_value = 0  # number of completed jobs
 
     def submit(self, fn, *args, **kwargs):
         """Increase worker count and handle submission as usual"""
-        with self._lock:
-            self._current_workers += 1
-            if (self._max_workers > 0) and (self._current_workers >= self._max_workers):
-                logger.error(f'Max workers [{self._max_workers}] reached, increase the number of workers! Attempted to run [{fn}]')
+        if not self._monitored:
+            return super().submit(fn, *args, **kwargs)
+        current_workers = next(self._submitted) - self._completed_value
+        if current_workers > self._max_workers:  # no worker is free to run the job right away
+            logger.error(f'Max workers [{self._max_workers}] reached, increase the number of workers! Attempted to run [{fn}]')
         result = super().submit(fn, *args, **kwargs)
-
-        def callback(_):
-            """Callback to decrease the worker count once the thread is done"""
-            with self._lock:
-                self._current_workers -= 1
-
-        result.add_done_callback(callback)
+        result.add_done_callback(self._job_done_callback)
         return result
+
+    def _job_done_callback(self, _):
+        """Callback to decrease the worker count once the thread is done"""
+        with self._completed_lock:
+            self._completed_value += 1
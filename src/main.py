@@ -22,6 +22,9 @@ from examples import gpiod_example
 from examples import simple_example
 
 
+_LOGLEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'error': logging.ERROR}
+
+
 class App():
 
     def display_usage(self):
@@ -41,38 +44,40 @@ class App():
     def parse_opts(self):
         """Parse and return command line arguments"""
         try:
-            opts, args = getopt.getopt(sys.argv[1:], 'l:v:?', ['help', 'loglevel=', 'verbose'])
+            opts, args = getopt.getopt(sys.argv[1:], 'l:v?', ['help', 'loglevel=', 'verbose'])
         except getopt.GetoptError as ex:
             print(ex)  # will print something like "option -a not recognized"
             self.display_usage()
             sys.exit(2)
-        loglevel = logging.INFO
-        verbose = False
-        for o, a in opts:
-            if o in ('-?', '--help'):
+        settings = {'loglevel': logging.INFO, 'verbose': False}
+
+        def show_help(a):
+            self.display_usage()
+            sys.exit()
+
+        def set_loglevel(a):
+            loglevel = _LOGLEVELS.get(a.lower().strip())
+            if loglevel is None:
+                print('invalid loglevel')
                 self.display_usage()
-                sys.exit()
-            elif o in ('-l', '--loglevel'):
-                a = a.lower().strip()
-                if a == 'debug':
-                    loglevel = logging.DEBUG
-                elif a == 'info':
-                    loglevel = logging.INFO
-                elif a == 'error':
-                    loglevel = logging.ERROR
-                else:
-                    print('invalid loglevel')
-                    self.display_usage()
-                    sys.exit(2)
-            elif o in ('-v', '--verbose'):
-                verbose = True
-            else:
-                assert False, 'unhandled option'
+                sys.exit(2)
+            settings['loglevel'] = loglevel
+
+        def set_verbose(a):
+            settings['verbose'] = True
+
+        handlers = {
+            '-?': show_help, '--help': show_help,
+            '-l': set_loglevel, '--loglevel': set_loglevel,
+            '-v': set_verbose, '--verbose': set_verbose,
+        }
+        for o, a in opts:
+            handlers[o](a)
         if len(args) != 0:
             print('invalid argument')
             self.display_usage()
             sys.exit(2)
-        return loglevel, verbose
+        return settings['loglevel'], settings['verbose']
 
     def configure_logging(self, loglevel, verbose):
         """Configure the logging module"""
@@ -102,11 +107,13 @@ class App():
 if __name__ == "__main__":
     configuration.get_config().load_config('/etc/mytool/config.yaml')
     app = App()
-    appmodules = {'simple_example' : simple_example}
-    appmodules.update({'controller_example' : controller_example})
-    appmodules.update({'gpiod_example' : gpiod_example})
-    appmodules.update({'cherrypy_example' : cherrypy_example})
-    appmodules.update({'clickhandler' : module_clickhandler})
-    appmodules.update({'prometheus' : module_prometheus})
-    # Note: remember to set "max_workers" above to a value high enough to support the number of threads of all modules
+    appmodules = {
+        'simple_example' : simple_example,
+        'controller_example' : controller_example,
+        'gpiod_example' : gpiod_example,
+        'cherrypy_example' : cherrypy_example,
+        'clickhandler' : module_clickhandler,
+        'prometheus' : module_prometheus,
+    }
+    # Note: "max_workers" above sizes the (monitored) default executor used via run_in_executor; threaded modules run their threads in a thread pool of their own
     app.run(appmodules=appmodules)